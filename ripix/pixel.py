@@ -1,72 +1,272 @@
 from __future__ import annotations
 # > Standard Modules
+import asyncio
+import shutil
+import sys
+from array import array
+from itertools import groupby
 from pathlib import Path, PurePath
-from typing import Iterable, Mapping, Tuple, Union, Optional, List
+from typing import Callable, Dict, Iterable, Iterator, Mapping, NamedTuple, Tuple, TypeVar, Union, Optional, List
 # > Graphics
 from PIL import Image as PILImageModule
 from PIL.Image import Image
 from PIL.Image import Resampling
+from rich.color import Color, ColorSystem
 from rich.console import Console, ConsoleOptions, RenderResult
 from rich.segment import Segment, Segments
 from rich.style import Style
+# > Optional
+try:
+    import numpy as np
+except ImportError: # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+# ! Constants
+_NULL_STYLE = Style.null()
+_NEWLINE_SEGMENT = Segment("\n", _NULL_STYLE)
+_TRANSPARENT_SEGMENT = Segment(" ", _NULL_STYLE)
+_TRANSPARENT_CODE = -1
+_PALETTES = ("truecolor", "256", "16")
+_UINT32_TYPECODE = "I" if array("I").itemsize == 4 else "L"
+assert array(_UINT32_TYPECODE).itemsize == 4, "no 32-bit unsigned array typecode"
+
+# ! Types
+_Channels = TypeVar("_Channels", int, "np.ndarray")
+
+class _PixelGrid(NamedTuple):
+    """An image stored as a palette of Segments and a flat, row-major array of palette ids."""
+    palette: List[Segment]
+    ids: Union["np.ndarray", "array[int]"]
+    width: int
+
+# ! Classes
+class _PaletteIds(Dict[int, int]):
+    """Assigns palette ids to colour keys in order of first appearance."""
+    
+    def __init__(self, segment_factory: Callable[[int], Segment]) -> None:
+        super().__init__()
+        self.segment_factory = segment_factory
+        self.palette: List[Segment] = []
+    
+    def __missing__(self, key: int) -> int:
+        index = self[key] = len(self.palette)
+        self.palette.append(self.segment_factory(key))
+        return index
+
+# ! Functions
+def _pixel_segment(pixel: int) -> Segment:
+    """Build the Segment for a packed 0xRRGGBBAA pixel."""
+    if pixel & 0xFF:
+        color = Color.from_rgb(pixel >> 24, (pixel >> 16) & 0xFF, (pixel >> 8) & 0xFF)
+        return Segment(" ", Style(bgcolor=color))
+    return _TRANSPARENT_SEGMENT
+
+def _visible_key(pixel: int) -> int:
+    """Normalise a packed 0xRRGGBBAA pixel so pixels that render alike share a key.
+    
+    Transparent pixels all become 0 and visible pixels get full alpha.
+    """
+    return pixel | 0xFF if pixel & 0xFF else 0
+
+def _fit_size(size: Tuple[int, int], bounds: Tuple[int, int]) -> Tuple[int, int]:
+    """Scale `size` down to fit within `bounds`, keeping its aspect ratio."""
+    width, height = size
+    max_width, max_height = bounds
+    if width <= max_width and height <= max_height:
+        return size
+    scale = min(max_width / width, max_height / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+def _ansi_segment(code: int) -> Segment:
+    """Build the Segment for an ANSI colour number, or -1 for a transparent pixel."""
+    if code == _TRANSPARENT_CODE:
+        return _TRANSPARENT_SEGMENT
+    return Segment(" ", Style(bgcolor=Color.from_ansi(code)))
+
+def _cube_index(r: _Channels, g: _Channels, b: _Channels) -> _Channels:
+    """Map RGB channels onto the 6x6x6 cube of the 256-colour palette.
+    
+    Accepts ints or NumPy arrays, so the same formula serves both pixel paths.
+    """
+    return 16 + 36 * (r * 6 // 256) + 6 * (g * 6 // 256) + b * 6 // 256
+
+def _ansi_code(pixel: int, palette: str) -> int:
+    """Quantize a packed 0xRRGGBBAA pixel to an ANSI colour number, or -1 if it is transparent."""
+    if not pixel & 0xFF:
+        return _TRANSPARENT_CODE
+    r, g, b = pixel >> 24, (pixel >> 16) & 0xFF, (pixel >> 8) & 0xFF
+    if palette == "256":
+        return _cube_index(r, g, b)
+    number = Color.from_rgb(r, g, b).downgrade(ColorSystem.STANDARD).number
+    assert number is not None
+    return number
+
+def _pixel_grid(image: Image, palette: str = "truecolor") -> _PixelGrid:
+    """Split an RGBA image into a palette of Segments and an array of palette ids.
+    
+    Pixels are packed into 0xRRGGBBAA integers first and normalised, so each
+    visible colour, and transparency, gets one palette entry. With the "256" or
+    "16" palette, colours are quantized to ANSI colour numbers and pixels that land
+    on the same number share an entry. Ids are stored as one byte per pixel when
+    the palette has at most 256 entries.
+    Uses NumPy when it is installed, otherwise the raw RGBA bytes are read into a
+    typed array of 32-bit keys, without building a Python tuple per pixel.
+    """
+    width, height = image.size
+    if np is not None:
+        pixels = np.ascontiguousarray(np.asarray(image, dtype=np.uint8))
+        keys = pixels.view(">u4").reshape(-1)
+        keys = np.where(keys & 0xFF, keys | 0xFF, 0)
+        unique_keys, ids = np.unique(keys, return_inverse=True)
+        ids = ids.reshape(-1)
+        if palette == "truecolor":
+            segments = [_pixel_segment(key) for key in unique_keys.tolist()]
+        else:
+            if palette == "256":
+                wide_keys = unique_keys.astype(np.int64)
+                codes = np.where(
+                    wide_keys & 0xFF,
+                    _cube_index(wide_keys >> 24, (wide_keys >> 16) & 0xFF, (wide_keys >> 8) & 0xFF),
+                    _TRANSPARENT_CODE
+                )
+            else:
+                codes = np.array([_ansi_code(key, palette) for key in unique_keys.tolist()], dtype=np.int64)
+            unique_codes, code_ids = np.unique(codes, return_inverse=True)
+            ids = code_ids.reshape(-1)[ids]
+            segments = [_ansi_segment(code) for code in unique_codes.tolist()]
+        id_type = np.uint8 if len(segments) <= 256 else np.uint32
+        return _PixelGrid(segments, ids.astype(id_type), width)
+    keys = array(_UINT32_TYPECODE, image.tobytes())
+    if sys.byteorder == "little":
+        keys.byteswap()
+    if palette == "truecolor":
+        codes = {key: _visible_key(key) for key in set(keys)}
+        palette_ids = _PaletteIds(_pixel_segment)
+    else:
+        codes = {key: _ansi_code(key, palette) for key in set(keys)}
+        palette_ids = _PaletteIds(_ansi_segment)
+    id_typecode = "B" if len(set(codes.values())) <= 256 else _UINT32_TYPECODE
+    ids = array(id_typecode, [palette_ids[codes[key]] for key in keys])
+    return _PixelGrid(palette_ids.palette, ids, width)
+
+def _segments_from_ascii(grid: str, mapping: Mapping[str, Segment]) -> List[Segment]:
+    """Run-length encode a grid of characters into Segments.
+    
+    Each run of a repeated character becomes a single Segment, replaced by its
+    Segment in `mapping` if it has one. Runs of the same character and length
+    share one Segment instance.
+    """
+    run_cache: Dict[Tuple[str, int], Segment] = {}
+    segments: List[Segment] = []
+    for character, run in groupby(grid):
+        count = sum(1 for _ in run)
+        segment = mapping.get(character)
+        if segment is not None and segment.control:
+            segments.extend([segment] * count)
+            continue
+        run_segment = run_cache.get((character, count))
+        if run_segment is None:
+            if segment is None:
+                run_segment = Segment(character * count)
+            elif count == 1:
+                run_segment = segment
+            else:
+                run_segment = Segment(segment.text * count, segment.style)
+            run_cache[(character, count)] = run_segment
+        segments.append(run_segment)
+    return segments
+
+def _render_pixel_grid(grid: _PixelGrid) -> Iterator[Segment]:
+    """Lazily yield the Segments of a pixel grid, one row at a time.
+    
+    Runs of same-coloured pixels in a row are merged into a single Segment.
+    """
+    palette, ids, width = grid
+    if not width:
+        return
+    for offset in range(0, len(ids), width):
+        for index, run in groupby(ids[offset:offset + width].tolist()):
+            segment = palette[index]
+            count = sum(1 for _ in run)
+            yield segment if count == 1 else Segment(segment.text * count, segment.style)
+        yield _NEWLINE_SEGMENT
 
 # ! Just Pixels
 class Pixels:
     def __init__(self) -> None:
         self._segments: Optional[Segments] = None
+        self._grid: Optional[_PixelGrid] = None
     
     @staticmethod
     def from_image(
         image: Image,
         resize: Optional[Tuple[int, int]] = None,
-        resample: Optional[Resampling] = None
+        resample: Optional[Resampling] = None,
+        palette: str = "truecolor",
+        fit: bool = False
     ) -> Pixels:
         resample = resample or Resampling.NEAREST
-        segments = Pixels._segments_from_image(image, resize, resample)
-        return Pixels.from_segments(segments)
+        grid = Pixels._grid_from_image(image, resize, resample, palette, fit)
+        return Pixels._from_grid(grid)
     
     @staticmethod
     def from_image_path(
         path: Union[PurePath, str],
         resize: Optional[Tuple[int, int]] = None,
-        resample: Optional[Resampling] = None
+        resample: Optional[Resampling] = None,
+        palette: str = "truecolor",
+        fit: bool = False
     ) -> Pixels:
         """Create a Pixels object from an image. Requires 'image' extra dependencies.
         
         Args:
             path: The path to the image file.
             resize: A tuple of (width, height) to resize the image to.
+            palette: The colours to draw with: "truecolor" (the default), or "256" or
+                "16" to quantize pixels to the ANSI palettes for terminals without truecolor.
+            fit: If no `resize` is given, shrink the image to fit the terminal, keeping its
+                aspect ratio, so no time is spent on pixels that would not fit on screen.
         """
         resample = resample or Resampling.NEAREST
+        grid = Pixels._grid_from_image_path(path, resize, resample, palette, fit)
+        return Pixels._from_grid(grid)
+    
+    @staticmethod
+    def _grid_from_image_path(
+        path: Union[PurePath, str],
+        resize: Optional[Tuple[int, int]] = None,
+        resample: Optional[Resampling] = None,
+        palette: str = "truecolor",
+        fit: bool = False
+    ) -> _PixelGrid:
         with PILImageModule.open(Path(path)) as image:
-            segments = Pixels._segments_from_image(image, resize, resample)
-        return Pixels.from_segments(segments)
+            return Pixels._grid_from_image(image, resize, resample, palette, fit)
     
     @staticmethod
-    def _segments_from_image(
+    def _grid_from_image(
         image: Image,
         resize: Optional[Tuple[int, int]] = None,
-        resample: Optional[Resampling] = None
-    ) -> List[Segment]:
+        resample: Optional[Resampling] = None,
+        palette: str = "truecolor",
+        fit: bool = False
+    ) -> _PixelGrid:
+        if palette not in _PALETTES:
+            raise ValueError(f"palette must be one of {_PALETTES}, not {palette!r}")
+        if resize is None and fit:
+            size = _fit_size(image.size, shutil.get_terminal_size())
+            if size != image.size:
+                resize = size
         if resize is not None:
             image = image.resize(resize, resample=resample)
         if image.mode != "RGBA":
             image = image.convert("RGBA")
-        height, width = image.size
-        null_style = Style.null()
-        segments = []
-        for y in range(width):
-            this_row = []
-            for x in range(height):
-                r, g, b, a = image.getpixel((x, y))
-                if a > 0:
-                    style = Style.parse(f"on rgb({r},{g},{b})")
-                else:
-                    style = null_style
-                this_row.append(Segment(" ", style))
-            this_row.append(Segment("\n", null_style))
-            segments += this_row
-        return segments
+        return _pixel_grid(image, palette)
+    
+    @staticmethod
+    def _from_grid(grid: _PixelGrid) -> Pixels:
+        pixels = Pixels()
+        pixels._grid = grid
+        return pixels
     
     @staticmethod
     def from_segments(
@@ -95,86 +295,84 @@ class Pixels:
             mapping = {}
         if not grid:
             return Pixels.from_segments([])
-        segments = []
-        for character in grid:
-            segment = mapping.get(character, Segment(character))
-            segments.append(segment)
-        return Pixels.from_segments(segments)
+        return Pixels.from_segments(_segments_from_ascii(grid, mapping))
     
     def __rich_console__(
         self, console: Console, options: ConsoleOptions
     ) -> RenderResult:
-        yield self._segments or ""
+        if self._grid is not None:
+            yield from _render_pixel_grid(self._grid)
+        else:
+            yield self._segments or ""
 
 # ! Asynchronous Pixels
 class AsyncPixels:
     def __init__(self) -> None:
         self._segments: Optional[Segments] = None
+        self._grid: Optional[_PixelGrid] = None
     
     @staticmethod
     async def from_image(
         image: Image,
         resize: Optional[Tuple[int, int]] = None,
-        resample: Optional[Resampling] = None
+        resample: Optional[Resampling] = None,
+        palette: str = "truecolor",
+        fit: bool = False
     ) -> AsyncPixels:
         resample = resample or Resampling.NEAREST
-        segments = await AsyncPixels._segments_from_image(image, resize, resample)
-        return await AsyncPixels.from_segments(segments)
+        loop = asyncio.get_running_loop()
+        grid = await loop.run_in_executor(
+            None, Pixels._grid_from_image, image, resize, resample, palette, fit
+        )
+        return AsyncPixels._from_grid(grid)
     
     @staticmethod
     async def from_image_path(
         path: Union[PurePath, str],
         resize: Optional[Tuple[int, int]] = None,
-        resample: Optional[Resampling] = None
+        resample: Optional[Resampling] = None,
+        palette: str = "truecolor",
+        fit: bool = False
     ) -> AsyncPixels:
         """Create a Pixels object from an image. Requires 'image' extra dependencies.
         
+        The image is opened and converted in the event loop's default executor.
+        
         Args:
             path: The path to the image file.
             resize: A tuple of (width, height) to resize the image to.
+            palette: The colours to draw with: "truecolor" (the default), or "256" or
+                "16" to quantize pixels to the ANSI palettes for terminals without truecolor.
+            fit: If no `resize` is given, shrink the image to fit the terminal, keeping its
+                aspect ratio, so no time is spent on pixels that would not fit on screen.
         """
         resample = resample or Resampling.NEAREST
-        with PILImageModule.open(Path(path)) as image:
-            segments = await AsyncPixels._segments_from_image(image, resize, resample)
-        return await AsyncPixels.from_segments(segments)
+        loop = asyncio.get_running_loop()
+        grid = await loop.run_in_executor(
+            None, Pixels._grid_from_image_path, path, resize, resample, palette, fit
+        )
+        return AsyncPixels._from_grid(grid)
     
     @staticmethod
-    async def _segments_from_image(
-        image: Image,
-        resize: Optional[Tuple[int, int]]=None,
-        resample: Optional[Resampling]=None
-    ) -> List[Segment]:
-        if resize is not None:
-            image = image.resize(resize, resample=resample)
-        if image.mode != "RGBA":
-            image = image.convert("RGBA")
-        height, width = image.size
-        null_style = Style.null()
-        segments = []
-        for y in range(width):
-            this_row = []
-            for x in range(height):
-                r, g, b, a = image.getpixel((x, y))
-                if a > 0:
-                    style = Style.parse(f"on rgb({r},{g},{b})")
-                else:
-                    style = null_style
-                this_row.append(Segment(" ", style))
-            this_row.append(Segment("\n", null_style))
-            segments += this_row
-        return segments
+    def _from_grid(grid: _PixelGrid) -> AsyncPixels:
+        pixels = AsyncPixels()
+        pixels._grid = grid
+        return pixels
     
     @staticmethod
-    async def from_segments(
+    def from_segments(
         segments: Iterable[Segment],
     ) -> AsyncPixels:
-        """Create a Pixels object from an Iterable of Segments instance."""
+        """Create a Pixels object from an Iterable of Segments instance.
+        
+        This performs no I/O, so unlike the image constructors it is not a coroutine.
+        """
         pixels = AsyncPixels()
         pixels._segments = Segments(segments)
         return pixels
     
     @staticmethod
-    async def from_ascii(
+    def from_ascii(
         grid: str,
         mapping: Optional[Mapping[str, Segment]] = None
     ) -> AsyncPixels:
@@ -182,6 +380,7 @@ class AsyncPixels:
         Create a Pixels object from a 2D-grid of ASCII characters.
         Each ASCII character can be mapped to a Segment (a character and style combo),
         allowing you to add a splash of colour to your grid.
+        This performs no I/O, so unlike the image constructors it is not a coroutine.
         
         Args:
             grid: A 2D grid of characters (a multi-line string).
@@ -191,14 +390,13 @@ class AsyncPixels:
         if mapping is None:
             mapping = {}
         if not grid:
-            return await AsyncPixels.from_segments([])
-        segments = []
-        async for character in grid:
-            segment = mapping.get(character, Segment(character))
-            segments.append(segment)
-        return await AsyncPixels.from_segments(segments)
+            return AsyncPixels.from_segments([])
+        return AsyncPixels.from_segments(_segments_from_ascii(grid, mapping))
     
     def __rich_console__(
         self, console: Console, options: ConsoleOptions
     ) -> RenderResult:
-        yield self._segments or ""
+        if self._grid is not None:
+            yield from _render_pixel_grid(self._grid)
+        else:
+            yield self._segments or ""
@@ -0,0 +1,8 @@
+import ripix
+from ripix.pixel import AsyncPixels, Pixels
+
+
+def test_package_exports():
+    assert ripix.__all__ == ["Pixels", "AsyncPixels"]
+    assert ripix.Pixels is Pixels
+    assert ripix.AsyncPixels is AsyncPixels
@@ -0,0 +1,190 @@
+import asyncio
+import io
+import os
+
+import pytest
+from PIL import Image
+from rich.console import Console
+from rich.segment import ControlType, Segment
+from rich.style import Style
+
+import ripix.pixel
+from ripix import AsyncPixels, Pixels
+from ripix.pixel import _fit_size
+
+
+def _render(renderable) -> str:
+    console = Console(
+        file=io.StringIO(),
+        width=200,
+        color_system="truecolor",
+        force_terminal=True,
+        legacy_windows=False,
+    )
+    console.print(renderable)
+    return console.file.getvalue()
+
+
+def _cells(renderable):
+    """Render to a list of rows of (character, style) cells."""
+    console = Console(width=200, color_system="truecolor", force_terminal=True)
+    rows = []
+    for line in console.render_lines(renderable, console.options, pad=False):
+        rows.append([
+            (character, segment.style or Style.null())
+            for segment in line
+            for character in segment.text
+        ])
+    return rows
+
+
+def _image_from_pixels(rows) -> Image.Image:
+    image = Image.new("RGBA", (len(rows[0]), len(rows)))
+    image.putdata([pixel for row in rows for pixel in row])
+    return image
+
+
+def _image() -> Image.Image:
+    image = Image.new("RGBA", (40, 12))
+    image.putdata([
+        ((x * 7) % 256, (y * 21) % 256, (x // 4) * 30, 0 if (x + y) % 5 == 0 else 255)
+        for y in range(12)
+        for x in range(40)
+    ])
+    return image
+
+
+@pytest.mark.parametrize("palette", ["truecolor", "256", "16"])
+def test_numpy_and_fallback_paths_render_the_same(monkeypatch, palette):
+    pytest.importorskip("numpy")
+    with_numpy = _render(Pixels.from_image(_image(), palette=palette))
+    monkeypatch.setattr(ripix.pixel, "np", None)
+    without_numpy = _render(Pixels.from_image(_image(), palette=palette))
+    assert with_numpy == without_numpy
+
+
+@pytest.mark.parametrize("palette, numbers", [("256", [196, 46, 16]), ("16", [1, 2, 0])])
+def test_palette_quantizes_to_ansi_numbers(palette, numbers):
+    image = _image_from_pixels([
+        [(255, 0, 0, 255), (0, 255, 0, 255), (5, 5, 5, 255), (90, 90, 90, 0)],
+    ])
+    pixels = Pixels.from_image(image, palette=palette)
+    [row] = _cells(pixels)
+    assert [style.bgcolor.number for _, style in row[:3]] == numbers
+    assert not row[3][1]
+    if palette == "256":
+        assert "48;5;196" in _render(pixels)
+
+
+def test_unknown_palette_raises():
+    with pytest.raises(ValueError):
+        Pixels._grid_from_image(Image.new("RGBA", (2, 2)), palette="8")
+
+
+@pytest.mark.parametrize("size, bounds, expected", [
+    ((10, 5), (80, 24), (10, 5)),
+    ((200, 100), (50, 100), (50, 25)),
+    ((100, 200), (80, 50), (25, 50)),
+    ((5000, 1), (80, 24), (80, 1)),
+])
+def test_fit_size(size, bounds, expected):
+    assert _fit_size(size, bounds) == expected
+
+
+def _fake_terminal(monkeypatch, columns, lines):
+    monkeypatch.setattr(
+        ripix.pixel.shutil, "get_terminal_size", lambda: os.terminal_size((columns, lines))
+    )
+
+
+def test_fit_shrinks_image_to_terminal(monkeypatch):
+    _fake_terminal(monkeypatch, 40, 20)
+    grid = Pixels.from_image(Image.new("RGB", (200, 50)), fit=True)._grid
+    assert grid.width == 40
+    assert len(grid.ids) // grid.width == 10
+
+
+def test_explicit_resize_overrides_fit(monkeypatch):
+    _fake_terminal(monkeypatch, 40, 20)
+    grid = Pixels.from_image(Image.new("RGB", (200, 50)), resize=(120, 30), fit=True)._grid
+    assert grid.width == 120
+    assert len(grid.ids) // grid.width == 30
+
+
+def test_async_from_segments_and_from_ascii_are_synchronous():
+    pixels = AsyncPixels.from_segments([Segment("ab"), Segment("\n"), Segment("cd")])
+    assert isinstance(pixels, AsyncPixels)
+    assert [[character for character, _ in row] for row in _cells(pixels)] == [["a", "b"], ["c", "d"]]
+    red = Style.parse("on red")
+    pixels = AsyncPixels.from_ascii("xo\n", {"x": Segment(" ", red)})
+    assert isinstance(pixels, AsyncPixels)
+    assert _cells(pixels) == [[(" ", red), ("o", Style.null())]]
+
+
+def test_async_from_image_matches_pixels():
+    image = _image()
+    pixels = asyncio.run(AsyncPixels.from_image(image))
+    assert isinstance(pixels, AsyncPixels)
+    assert _cells(pixels) == _cells(Pixels.from_image(image))
+
+
+_ASCII_GRID = """\
+  xx   xx!!
+
+oo xxx  ab
+\n\nabab
+"""
+_ASCII_MAPPING = {
+    "x": Segment(" ", Style.parse("on yellow")),
+    "o": Segment("<>", Style.parse("blue on white")),
+    "!": Segment("", control=[(ControlType.BELL,)]),
+}
+
+
+@pytest.mark.parametrize("cls", [Pixels, AsyncPixels])
+def test_from_ascii_matches_per_character_expansion(cls):
+    pixels = cls.from_ascii(_ASCII_GRID, _ASCII_MAPPING)
+    expected = Pixels.from_segments(
+        _ASCII_MAPPING.get(character, Segment(character)) for character in _ASCII_GRID
+    )
+    assert _cells(pixels) == _cells(expected)
+    segments = pixels._segments.segments
+    assert segments.count(_ASCII_MAPPING["!"]) == _ASCII_GRID.count("!")
+
+
+def test_from_ascii_shares_segments_between_repeated_runs():
+    segments = Pixels.from_ascii("ab\nab\n", {})._segments.segments
+    assert segments[0] is segments[3]
+    assert segments[1] is segments[4]
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_render_merges_runs_of_pixels_that_look_the_same(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(ripix.pixel, "np", None)
+    a, half_a, b = (10, 20, 30, 255), (10, 20, 30, 128), (200, 0, 0, 255)
+    image = _image_from_pixels([[a, half_a, (1, 1, 1, 0), (2, 2, 2, 0), b]])
+    grid = Pixels.from_image(image)._grid
+    segments = list(ripix.pixel._render_pixel_grid(grid))
+    assert len(grid.palette) == 3
+    assert [len(segment.text) for segment in segments] == [2, 2, 1, 1]
+    assert segments[1].style == Style.null()
+    assert segments[-1].text == "\n"
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+@pytest.mark.parametrize("rows", [
+    [[(255, 0, 0, 255), (0, 255, 0, 255), (0, 0, 255, 255)]],
+    [[(255, 0, 0, 255)], [(0, 255, 0, 255)], [(0, 0, 255, 255)]],
+])
+def test_non_square_images_keep_their_orientation(monkeypatch, use_numpy, rows):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(ripix.pixel, "np", None)
+    cells = _cells(Pixels.from_image(_image_from_pixels(rows)))
+    assert [[tuple(style.bgcolor.triplet) for _, style in row] for row in cells] == [
+        [pixel[:3] for pixel in row] for row in rows
+    ]